@@ -6,7 +6,10 @@ Supports both image files and clipboard input.
 """
 
 import argparse
+import base64
+import hashlib
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -19,16 +22,44 @@ from ocr_lib import (
     save_output, 
     copy_to_clipboard,
     set_api_provider,
-    DEFAULT_MODEL,
-    API_NAME,
+    resolve_model,
+    PROMPT_VERSION,
+    current_provider,
     MAX_IMAGE_SIZE_MB,
     MAX_IMAGE_DIMENSION,
+    MAX_API_IMAGE_DIMENSION,
     logger
 )
 
 # Supported image formats
 SUPPORTED_FORMATS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
 
+# OCR result cache: repeated runs on the same image (e.g. comparing
+# models) skip the decode, re-encode, and API call. Keyed on the source
+# bytes plus the OCR config so any relevant change misses cleanly.
+CACHE_DIR = Path.home() / '.cache' / 'ocr' / 'text'
+
+
+def _text_cache_path(image_path: Path, model: str) -> Path:
+    """Cache file for one (image content, OCR config) combination."""
+    digest = hashlib.sha256(image_path.read_bytes()).hexdigest()[:32]
+    # current_provider() reads the live ocr_lib config: a module-load copy
+    # of the provider name would predate any --provider override and mix
+    # cache entries across providers
+    key = f"{digest}-{model}-{current_provider()}-p{PROMPT_VERSION}".replace('/', '-')
+    return CACHE_DIR / (key + '.txt')
+
+
+def _store_cached_text(cache_path: Path, text: str) -> None:
+    """Persist an OCR result; failures only cost the cache, never the run."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix('.txt.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache OCR result: {e}")
+
 
 def load_image_from_file(file_path: str) -> Image.Image:
     """
@@ -45,12 +76,13 @@ def load_image_from_file(file_path: str) -> Image.Image:
         ValueError: If image format is not supported or file is too large
     """
     path = Path(file_path)
-    
-    if not path.exists():
+
+    # One stat covers both the existence and the size check
+    try:
+        file_size = os.stat(path).st_size
+    except FileNotFoundError:
         raise FileNotFoundError(f"Image file not found: {file_path}")
-    
-    # Check file size before loading
-    file_size = path.stat().st_size
+
     max_size_bytes = MAX_IMAGE_SIZE_MB * 1024 * 1024
     
     if file_size > max_size_bytes:
@@ -75,18 +107,62 @@ def load_image_from_file(file_path: str) -> Image.Image:
             f"(max: {MAX_IMAGE_DIMENSION}x{MAX_IMAGE_DIMENSION})"
         )
     
-    # Verify it's actually an image (not just extension spoofing)
+    # JPEG decoder hint: when the image exceeds the API limit and will be
+    # downscaled anyway, let libjpeg decode at 1/2, 1/4, or 1/8 scale
+    # (never below the target) instead of full resolution. No-op for
+    # other formats; must come after the dimension validation above,
+    # which checks the true size.
+    image.draft(None, (MAX_API_IMAGE_DIMENSION, MAX_API_IMAGE_DIMENSION))
+
+    # Verify it's actually an image (not just extension spoofing).
+    # load() decodes the pixel data in place — corrupt or spoofed files
+    # raise here — and avoids the verify()+reopen double parse; the
+    # decode isn't wasted since encoding needs the pixels anyway.
     try:
-        image.verify()
-        # Reopen after verify (verify() closes the file)
-        image = Image.open(path)
+        image.load()
     except Exception as e:
         logger.error(f"Image verification failed: {str(e)}")
         raise ValueError(f"File is not a valid image: {str(e)}")
-    
+
     return image
 
 
+def encode_jpeg_file_direct(file_path: str) -> str | None:
+    """
+    Fast path for on-disk JPEGs: base64 the file bytes without a decode
+    and lossy re-encode round trip.
+
+    Returns None whenever the file needs the full validation/encode path
+    (wrong format despite the extension, oversized, unreadable), so the
+    caller can simply fall through.
+
+    Args:
+        file_path: Path to image file
+
+    Returns:
+        Base64-encoded JPEG string, or None to defer to the normal path
+    """
+    path = Path(file_path)
+    if path.suffix.lower() not in {'.jpg', '.jpeg'}:
+        return None
+
+    try:
+        if path.stat().st_size > MAX_IMAGE_SIZE_MB * 1024 * 1024:
+            return None
+
+        # Header-only open: checks real format and dimensions without
+        # decoding any pixel data
+        with Image.open(path) as im:
+            if im.format != 'JPEG':
+                return None  # Extension spoofing — full path will reject it
+            if im.width > MAX_API_IMAGE_DIMENSION or im.height > MAX_API_IMAGE_DIMENSION:
+                return None  # Needs the resize path
+
+        return base64.b64encode(path.read_bytes()).decode('ascii')
+    except Exception:
+        return None  # Let the full path surface a proper error
+
+
 def load_image_from_clipboard() -> Image.Image:
     """
     Load image from clipboard with validation.
@@ -181,7 +257,7 @@ Environment Variables:
     
     # Show model list if requested
     if args.list_models:
-        print(f"Currently using: {API_NAME}")
+        print(f"Currently using: {current_provider()}")
         print("\nPopular Vision Models:")
         print("  OpenAI:")
         print("    - gpt-4o (best, most capable)")
@@ -203,26 +279,51 @@ Environment Variables:
         parser.error("Cannot use both --clipboard and image file")
     
     try:
-        # Load image
-        print("Loading image...", file=sys.stderr)
-        if args.clipboard:
-            image = load_image_from_clipboard()
-            print("✓ Image loaded from clipboard", file=sys.stderr)
-        else:
-            image = load_image_from_file(args.image)
-            print(f"✓ Image loaded from {args.image}", file=sys.stderr)
-        
-        # Convert to base64
-        print("Encoding image...", file=sys.stderr)
-        image_base64 = encode_image_to_base64(image)
-        print("✓ Image encoded", file=sys.stderr)
-        
-        # Perform OCR
-        model = args.model or DEFAULT_MODEL
-        print(f"Performing OCR with {API_NAME} ({model})...", file=sys.stderr)
-        extracted_text = perform_ocr(image_base64, model)
-        print("✓ OCR completed\n", file=sys.stderr)
-        
+        model = resolve_model(args.model)
+
+        # Cached result for this exact image + OCR config? Skip the
+        # decode, re-encode, and API call entirely (file input only —
+        # clipboard content has no stable identity to key on)
+        cache_path = None
+        extracted_text = None
+        if args.image:
+            try:
+                cache_path = _text_cache_path(Path(args.image), model)
+                if cache_path.exists():
+                    extracted_text = cache_path.read_text(encoding='utf-8')
+                    print("✓ Using cached OCR result\n", file=sys.stderr)
+            except OSError:
+                cache_path = None  # Unreadable input fails properly below
+
+        if extracted_text is None:
+            # On-disk JPEGs within limits skip the decode + re-encode
+            image_base64 = encode_jpeg_file_direct(args.image) if args.image else None
+            if image_base64:
+                print(f"✓ JPEG passed through from {args.image}", file=sys.stderr)
+            else:
+                # Load image
+                print("Loading image...", file=sys.stderr)
+                if args.clipboard:
+                    image = load_image_from_clipboard()
+                    print("✓ Image loaded from clipboard", file=sys.stderr)
+                else:
+                    image = load_image_from_file(args.image)
+                    print(f"✓ Image loaded from {args.image}", file=sys.stderr)
+
+                # Convert to base64
+                print("Encoding image...", file=sys.stderr)
+                image_base64 = encode_image_to_base64(image)
+                print("✓ Image encoded", file=sys.stderr)
+
+            # Perform OCR
+            print(f"Performing OCR with {current_provider()} ({model})...", file=sys.stderr)
+            extracted_text = perform_ocr(image_base64, model)
+            print("✓ OCR completed\n", file=sys.stderr)
+
+            if cache_path is not None:
+                _store_cached_text(cache_path, extracted_text)
+
+
         # Output results
         to_clipboard = args.clipboard and not args.output and not args.no_clipboard_copy
         save_output(extracted_text, args.output, to_clipboard)
@@ -5,13 +5,16 @@ Provides image encoding, OCR API calls, and output handling.
 """
 
 import base64
+import json
 import logging
 import os
+import queue
 import sys
 import tempfile
 import time
+from collections import deque
 from contextlib import contextmanager
-from functools import wraps
+from functools import lru_cache, wraps
 from io import BytesIO
 from pathlib import Path
 
@@ -40,8 +43,25 @@ DEFAULT_MODEL = OPENAI_MODEL if USE_OPENAI else OPENROUTER_MODEL
 API_URL = OPENAI_API_URL if USE_OPENAI else OPENROUTER_API_URL
 API_NAME = "OpenAI" if USE_OPENAI else "OpenRouter"
 
+# Version of the OCR prompt sent by perform_ocr; bump when the prompt text
+# changes so cached results produced with the old prompt are invalidated
+PROMPT_VERSION = 1
+
 # Image processing constants
-IMAGE_ENCODE_QUALITY = 95  # High quality for OCR accuracy
+# JPEG quality: 95 by default for OCR accuracy; uploads scale roughly
+# linearly with JPEG size, so bandwidth-constrained setups can lower it
+try:
+    IMAGE_ENCODE_QUALITY = min(100, max(1, int(os.getenv("OCR_JPEG_QUALITY", "95"))))
+except ValueError:
+    IMAGE_ENCODE_QUALITY = 95
+MAX_API_IMAGE_DIMENSION = 4096  # Largest dimension sent to vision models
+# Optional total-pixel budget (e.g. 2000000 for ~2MP): images above it are
+# pre-downscaled before JPEG encoding, trading detail for faster encode and
+# upload. 0 (the default) disables the cap and keeps full OCR quality.
+try:
+    MAX_IMAGE_PIXELS = max(0, int(os.getenv("OCR_MAX_PIXELS", "0")))
+except ValueError:
+    MAX_IMAGE_PIXELS = 0
 API_TIMEOUT_SECONDS = 60   # Generous timeout for vision models
 
 # Security constants
@@ -50,16 +70,45 @@ MAX_IMAGE_DIMENSION = 8000  # Maximum image dimension in pixels
 MAX_EXCALIDRAW_SIZE_MB = 10  # Maximum Excalidraw file size
 
 # Setup logging
+class _LazyFileHandler(logging.Handler):
+    """FileHandler that defers directory creation and file open until the
+    first record is actually emitted, so importing the library (or runs
+    like --list-models that never log) skip the startup filesystem I/O."""
+
+    def __init__(self, filename, level=logging.NOTSET):
+        super().__init__(level)
+        self._filename = filename
+        self._handler = None
+
+    def _real_handler(self):
+        if self._handler is None:
+            Path(self._filename).parent.mkdir(parents=True, exist_ok=True)
+            self._handler = logging.FileHandler(self._filename)
+            if self.formatter is not None:
+                self._handler.setFormatter(self.formatter)
+        return self._handler
+
+    def emit(self, record):
+        try:
+            self._real_handler().emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self._handler is not None:
+            self._handler.close()
+        super().close()
+
+
 def setup_logging(log_level=logging.INFO):
     """Configure logging for security events and debugging."""
     log_dir = Path.home() / '.ocr' / 'logs'
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
+
     logging.basicConfig(
         level=log_level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(log_dir / 'ocr.log'),
+            _LazyFileHandler(log_dir / 'ocr.log'),
             logging.StreamHandler(sys.stderr) if os.getenv('DEBUG') else logging.NullHandler()
         ]
     )
@@ -71,6 +120,52 @@ setup_logging()
 import threading
 _config_lock = threading.Lock()
 
+# Optional fast JSON serializer for the request body, which is dominated
+# by the multi-megabyte base64 image string
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+# Optional SIMD base64 (pybase64): multi-GB/s vs the stdlib encoder on
+# the multi-megabyte image payloads, and returns str without an extra
+# decode copy
+try:
+    import pybase64
+
+    def _b64_as_string(data) -> str:
+        return pybase64.b64encode_as_string(data)
+except ImportError:
+    def _b64_as_string(data) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+# Optional SIMD JPEG encoder (libjpeg-turbo). TurboJPEG() probes for the
+# shared library at construction time, so failures of any kind mean
+# "use PIL's codec" rather than an import error for users without it.
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+    import numpy as _np  # turbojpeg operates on numpy arrays
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
+# Shared HTTP session: keep-alive pooling means batch and watch modes pay
+# the TLS handshake once per connection instead of once per file. Session
+# objects are thread-safe for concurrent requests.
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_HTTP_RETRIES = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    raise_on_status=False  # Let us handle status codes
+)
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=_HTTP_RETRIES))
+_HTTP_SESSION.mount("http://", HTTPAdapter(max_retries=_HTTP_RETRIES))
+
 def set_api_provider(provider: str):
     """
     Override the default API provider selection (thread-safe).
@@ -108,21 +203,67 @@ def set_api_provider(provider: str):
             raise ValueError(f"Invalid provider: {provider}. Must be 'openai' or 'openrouter'.")
 
 
+def current_provider() -> str:
+    """
+    Name of the API provider currently in effect.
+
+    Reads the live module state, unlike `from ocr_lib import API_NAME`,
+    which binds the value before any set_api_provider() override.
+    """
+    return API_NAME
+
+
+def resolve_model(model: str | None = None) -> str:
+    """
+    Resolve the effective OCR model once, honoring provider overrides.
+
+    Callers that process many files should resolve the model a single time
+    up front and pass the concrete name through, rather than letting each
+    perform_ocr call fall back to the module default. This also avoids the
+    stale-import trap: `from ocr_lib import DEFAULT_MODEL` binds the value
+    at import time and misses a later set_api_provider() switch, while this
+    function always reads the current module state.
+
+    Args:
+        model: Explicit model name, or None to use the provider default
+
+    Returns:
+        Model name to use for OCR requests
+    """
+    return model or DEFAULT_MODEL
+
+
 def validate_output_path(output_path: str | Path, allow_absolute: bool = True, allow_temp: bool = False) -> Path:
     """
     Validate output path to prevent path traversal attacks.
-    
+
+    Results are memoized per (path, flags): watch mode validates the same
+    path several times per processing cycle and resolve() costs a syscall
+    chain each time. Only successful validations are cached (lru_cache
+    does not cache raised exceptions), so rejections are always re-checked.
+
     Args:
         output_path: Path to validate
         allow_absolute: Whether to allow absolute paths outside CWD
         allow_temp: Whether to allow temporary directory paths (needed for temp files)
-    
+
     Returns:
         Validated Path object
-        
+
     Raises:
         ValueError: If path is unsafe
     """
+    return _validate_output_path(str(output_path), allow_absolute, allow_temp)
+
+
+# System directories writes must never land in; a single tuple-argument
+# startswith checks all of them in one C-level call
+_SENSITIVE_DIR_PREFIXES = ('/etc/', '/usr/', '/bin/', '/sbin/', '/boot/', '/sys/', '/proc/')
+
+
+@lru_cache(maxsize=1024)
+def _validate_output_path(output_path: str, allow_absolute: bool, allow_temp: bool) -> Path:
+    """Uncached body of validate_output_path (see its docstring)."""
     path = Path(output_path)
     
     # Check for path traversal attempts
@@ -148,13 +289,13 @@ def validate_output_path(output_path: str | Path, allow_absolute: bool = True, a
             logger.warning(f"Path outside CWD rejected: {resolved}")
             raise ValueError(f"Path {resolved} is outside current directory {cwd}")
     
-    # Block sensitive system directories
-    sensitive_dirs = ['/etc', '/usr', '/bin', '/sbin', '/boot', '/sys', '/proc']
-    for sensitive in sensitive_dirs:
-        if str(resolved).startswith(sensitive):
-            logger.error(f"Attempt to write to sensitive directory: {resolved}")
-            raise ValueError(f"Writing to {sensitive} is not allowed")
-    
+    # Block sensitive system directories. The appended '/' makes the
+    # prefixes match whole path components, so '/etcetera' passes while
+    # '/etc' itself and anything under it are still caught.
+    if (str(resolved) + '/').startswith(_SENSITIVE_DIR_PREFIXES):
+        logger.error(f"Attempt to write to sensitive directory: {resolved}")
+        raise ValueError(f"Writing to {resolved} is not allowed")
+
     return resolved
 
 
@@ -166,75 +307,164 @@ def rate_limit(max_calls: int = 10, period: int = 60):
         max_calls: Maximum number of calls allowed
         period: Time period in seconds
     """
-    calls = []
-    
+    # Timestamps age out from the left, so a deque pops expired entries
+    # in O(1) instead of rebuilding a list on every call. Monotonic time
+    # keeps the window immune to wall-clock adjustments. The lock guards
+    # the pop/peek/append bookkeeping — the decorated call runs in the
+    # watch and scan thread pools, and an unsynchronized popleft can
+    # raise IndexError when two workers race on the last expired entry.
+    calls = deque()
+    window_lock = threading.Lock()
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            now = time.time()
-            # Remove old calls
-            calls[:] = [c for c in calls if c > now - period]
-            
-            if len(calls) >= max_calls:
-                sleep_time = period - (now - calls[0])
-                if sleep_time > 0:
-                    logger.info(f"Rate limit reached. Waiting {sleep_time:.1f}s...")
-                    print(f"Rate limit reached. Waiting {sleep_time:.1f}s...", 
-                          file=sys.stderr)
-                    time.sleep(sleep_time)
-                    calls.clear()
-            
-            calls.append(time.time())
+            with window_lock:
+                now = time.monotonic()
+                # Remove old calls
+                while calls and calls[0] <= now - period:
+                    calls.popleft()
+
+                if len(calls) >= max_calls:
+                    sleep_time = period - (now - calls[0])
+                    if sleep_time > 0:
+                        logger.info(f"Rate limit reached. Waiting {sleep_time:.1f}s...")
+                        print(f"Rate limit reached. Waiting {sleep_time:.1f}s...",
+                              file=sys.stderr)
+                        time.sleep(sleep_time)
+                        calls.clear()
+
+                calls.append(time.monotonic())
             return func(*args, **kwargs)
         return wrapper
     return decorator
 
 
+# Pool of reusable JPEG encode buffers: concurrent watch workers each grab
+# their own, and reuse avoids re-growing a multi-MB BytesIO per image
+_ENCODE_BUFFER_POOL: queue.Queue = queue.Queue(maxsize=4)
+
+
 def encode_image_to_base64(image: Image.Image) -> str:
     """
     Convert PIL Image to base64-encoded JPEG string.
-    
+
     Args:
         image: PIL Image object
-    
+
     Returns:
         Base64-encoded JPEG image string
-    
+
     Note:
         Converts RGBA/LA/P images to RGB with white background for compatibility.
         Resizes very large images to prevent API payload issues.
     """
-    buffered = BytesIO()
-    
     # Convert to RGB if necessary (for PNG with transparency, etc.)
     if image.mode in ("RGBA", "LA", "P"):
-        background = Image.new("RGB", image.size, (255, 255, 255))
         if image.mode == "P":
-            image = image.convert("RGBA")
-        background.paste(image, mask=image.split()[-1] if image.mode in ("RGBA", "LA") else None)
-        image = background
-    
-    # Resize if image is too large (helps prevent API payload issues)
-    max_dimension = 4096  # Reasonable size for vision models
+            # Palette images without transparency go straight to RGB
+            if "transparency" in image.info:
+                image = image.convert("RGBA")
+            else:
+                image = image.convert("RGB")
+        if image.mode in ("RGBA", "LA"):
+            if image.getchannel("A").getextrema()[0] == 255:
+                # Fully opaque: a plain convert skips the whole
+                # white-background allocation and composite
+                image = image.convert("RGB")
+            else:
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+    
+    # Opt-in total-pixel budget: encode and upload cost scale with pixel
+    # count, so setups that favor speed over detail can cap it via
+    # OCR_MAX_PIXELS. Disabled by default (MAX_IMAGE_PIXELS == 0).
+    if MAX_IMAGE_PIXELS and image.width * image.height > MAX_IMAGE_PIXELS:
+        ratio = (MAX_IMAGE_PIXELS / (image.width * image.height)) ** 0.5
+        target = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
+        logger.info(f"Applying pixel budget: {image.width}x{image.height} -> {target[0]}x{target[1]}")
+        image.thumbnail(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    # Resize if image is too large (helps prevent API payload issues).
+    # thumbnail() pre-shrinks with fast box-filter reduce steps before
+    # the final LANCZOS pass — several times faster than a straight
+    # resize() for big downscales. Note: it scales the image in place.
+    max_dimension = MAX_API_IMAGE_DIMENSION
     if image.width > max_dimension or image.height > max_dimension:
         logger.info(f"Resizing large image from {image.width}x{image.height}")
-        ratio = min(max_dimension / image.width, max_dimension / image.height)
-        new_size = (int(image.width * ratio), int(image.height * ratio))
-        image = image.resize(new_size, Image.Resampling.LANCZOS)
+        image.thumbnail(
+            (max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=2.0
+        )
         logger.info(f"Resized to {image.width}x{image.height}")
     
-    image.save(buffered, format="JPEG", quality=IMAGE_ENCODE_QUALITY)
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+    # SIMD JPEG path: libjpeg-turbo's vectorized DCT encodes the large
+    # 2x-scaled canvases several times faster than PIL's codec
+    if _turbojpeg is not None and image.mode == "RGB":
+        try:
+            jpeg = _turbojpeg.encode(
+                _np.asarray(image), quality=IMAGE_ENCODE_QUALITY,
+                pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420
+            )
+            return _b64_as_string(jpeg)
+        except Exception as e:
+            logger.warning(f"turbojpeg encode failed ({e}), falling back to PIL")
+
+    try:
+        buffered = _ENCODE_BUFFER_POOL.get_nowait()
+        buffered.seek(0)
+        buffered.truncate()
+    except queue.Empty:
+        buffered = BytesIO()
+
+    try:
+        # 4:2:0 chroma subsampling: rendered drawings are effectively
+        # line art, so halving chroma resolution is visually lossless
+        # for OCR while cutting upload bytes substantially
+        image.save(buffered, format="JPEG", quality=IMAGE_ENCODE_QUALITY, subsampling=2)
+        # getbuffer() hands the encoder a zero-copy view of the JPEG
+        # bytes; getvalue() would duplicate the whole payload first. The
+        # view must be released before the pooled buffer can be resized.
+        view = buffered.getbuffer()
+        try:
+            return _b64_as_string(view)
+        finally:
+            view.release()
+    finally:
+        try:
+            _ENCODE_BUFFER_POOL.put_nowait(buffered)
+        except queue.Full:
+            pass  # Pool is bounded; let extra buffers be collected
+
+
+def encode_png_bytes_to_base64(png_bytes: bytes) -> str:
+    """
+    Base64-encode ready-made PNG bytes for the OCR API.
+
+    Skips the PIL decode + re-encode round trip that
+    encode_image_to_base64 pays; use when the PNG is already sized
+    within MAX_API_IMAGE_DIMENSION (pass mime_type='image/png' to
+    perform_ocr alongside).
+
+    Args:
+        png_bytes: PNG image data
+
+    Returns:
+        Base64-encoded image string
+    """
+    return _b64_as_string(png_bytes)
 
 
 @rate_limit(max_calls=10, period=60)  # 10 requests per minute
-def perform_ocr(image_base64: str, model: str | None = None) -> str:
+def perform_ocr(image_base64: str, model: str | None = None,
+                mime_type: str = "image/jpeg") -> str:
     """
     Send image to OpenAI or OpenRouter API for OCR using vision models.
-    
+
     Args:
         image_base64: Base64-encoded image string
         model: Model to use (optional, uses OPENAI_MODEL or OPENROUTER_MODEL env var)
+        mime_type: MIME type of the encoded image (default JPEG)
     
     Returns:
         Extracted text from the image
@@ -275,7 +505,7 @@ def perform_ocr(image_base64: str, model: str | None = None) -> str:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
+                            "url": f"data:{mime_type};base64,{image_base64}"
                         },
                     },
                 ],
@@ -283,35 +513,32 @@ def perform_ocr(image_base64: str, model: str | None = None) -> str:
         ],
     }
     
+    # Serialize the body once up front: requests' json= would push the
+    # multi-MB base64 string through the stdlib encoder per attempt, and a
+    # ready bytes body stays replayable for the adapter's retry policy
+    if _orjson is not None:
+        body = _orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
     try:
-        # Create session with retries
-        session = requests.Session()
-        from requests.adapters import HTTPAdapter
-        from urllib3.util.retry import Retry
-        
-        retries = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["POST"],
-            raise_on_status=False  # Let us handle status codes
-        )
-        
-        adapter = HTTPAdapter(max_retries=retries)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        
+        # Reuse the shared keep-alive session (retries are mounted on it)
         logger.info(f"Sending OCR request to {API_NAME} (may retry up to 5 times on errors)...")
-        response = session.post(
-            API_URL, 
-            headers=headers, 
-            json=payload, 
+        response = _HTTP_SESSION.post(
+            API_URL,
+            headers=headers,
+            data=body,
             timeout=API_TIMEOUT_SECONDS,
             verify=True  # Explicit HTTPS verification
         )
         response.raise_for_status()
         
-        data = response.json()
+        # Parse with orjson when available; response.json() routes through
+        # the slower stdlib decoder
+        if _orjson is not None:
+            data = _orjson.loads(response.content)
+        else:
+            data = response.json()
         
         if "error" in data:
             logger.error(f"API error: {data['error']}")
@@ -373,21 +600,23 @@ def save_output(text: str, output_path: str | None = None, to_clipboard: bool =
 
 
 @contextmanager
-def temp_file(suffix: str = "", secure: bool = True):
+def temp_file(suffix: str = "", secure: bool = True, wipe: bool = False):
     """
     Context manager for temporary files with automatic cleanup and secure permissions.
-    
+
     Args:
         suffix: File suffix/extension (e.g., '.svg', '.png')
         secure: Whether to use secure file creation (restrictive permissions)
-    
+        wipe: Overwrite contents with random data before unlinking (slow;
+            for sensitive payloads on filesystems that don't free extents)
+
     Yields:
         Path to temporary file
-    
+
     Note:
         File is automatically deleted when context exits, even if exception occurs.
         Secure mode creates files with 0o600 permissions (owner read/write only).
-    
+
     Example:
         with temp_file('.png') as png_path:
             # Use png_path
@@ -409,17 +638,30 @@ def temp_file(suffix: str = "", secure: bool = True):
     finally:
         try:
             if os.path.exists(path):
-                # Securely wipe file before deletion for sensitive data (< 100MB)
-                if secure and os.path.getsize(path) < 100 * 1024 * 1024:
+                if wipe and os.path.getsize(path) < 100 * 1024 * 1024:
+                    # Overwrite in 64KB chunks: avoids allocating a
+                    # file-sized buffer, and random data beats zeros on
+                    # filesystems that compress or dedupe
                     try:
                         with open(path, 'r+b') as f:
-                            size = os.path.getsize(path)
-                            if size > 0:
-                                f.write(b'\x00' * size)
-                                f.flush()
-                                os.fsync(f.fileno())
+                            remaining = os.path.getsize(path)
+                            while remaining > 0:
+                                chunk = min(remaining, 64 * 1024)
+                                f.write(os.urandom(chunk))
+                                remaining -= chunk
+                            f.flush()
+                            os.fsync(f.fileno())
                     except Exception:
                         pass  # Best effort wipe
+                else:
+                    # Dropping the extents is enough for rendered
+                    # drawings: truncate frees the blocks on modern
+                    # filesystems without a file-sized write + fsync
+                    # stall on every render
+                    try:
+                        os.truncate(path, 0)
+                    except OSError:
+                        pass
                 os.unlink(path)
         except OSError:
             pass  # Best effort cleanup